@@ -3,6 +3,20 @@ import psycopg2
 import pandas as pd
 from psycopg2 import sql
 import re
+import os
+import time
+import uuid
+import tempfile
+import shutil
+import atexit
+import threading
+import sqlite3
+import hashlib
+import json
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import pyarrow as pa
 
 st.set_page_config(
     page_title="PostgreSQL Admin Tool",
@@ -48,8 +62,462 @@ if 'tables' not in st.session_state:
     st.session_state.tables = []
 if 'selected_table' not in st.session_state:
     st.session_state.selected_table = None
-if 'query_history' not in st.session_state:
-    st.session_state.query_history = []
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'explorer_result' not in st.session_state:
+    st.session_state.explorer_result = None
+if 'editor_result' not in st.session_state:
+    st.session_state.editor_result = None
+if 'sampled_profile' not in st.session_state:
+    st.session_state.sampled_profile = None
+if 'connection_params' not in st.session_state:
+    st.session_state.connection_params = None
+if 'maintenance_candidates' not in st.session_state:
+    st.session_state.maintenance_candidates = None
+if 'maintenance_jobs' not in st.session_state:
+    st.session_state.maintenance_jobs = []
+
+# Result store settings (sizes in MB, overridable from the environment)
+RESULT_SESSION_MEMORY_MB = int(os.environ.get("PGADMIN_SESSION_MEMORY_MB", "256"))
+RESULT_GLOBAL_MEMORY_MB = int(os.environ.get("PGADMIN_GLOBAL_MEMORY_MB", "1024"))
+RESULT_SPILL_THRESHOLD_MB = int(os.environ.get("PGADMIN_SPILL_THRESHOLD_MB", "64"))
+RESULT_SPILL_DIR = os.environ.get(
+    "PGADMIN_SPILL_DIR", os.path.join(tempfile.gettempdir(), "pgadmin_results")
+)
+RESULT_IDLE_TTL = int(os.environ.get("PGADMIN_RESULT_TTL", "3600"))
+RESULT_MAX_PER_SESSION = 10
+RESULT_PAGE_SIZE = 500
+RESULT_FETCH_SIZE = 10000
+CATEGORY_MAX_RATIO = 0.5
+
+# Query history settings
+HISTORY_DIR = os.environ.get(
+    "PGADMIN_HISTORY_DIR", os.path.join(os.path.expanduser("~"), ".pgadmin_tool", "history")
+)
+HISTORY_BASELINE_RUNS = 100
+HISTORY_MAX_RUNS_PER_QUERY = 200
+HISTORY_RETENTION_DAYS = int(os.environ.get("PGADMIN_HISTORY_RETENTION_DAYS", "90"))
+HISTORY_MIN_BASELINE_RUNS = 5
+REGRESSION_FACTOR = 2.0
+REGRESSION_MIN_DELTA_MS = 50
+
+# Arrow types for PostgreSQL type OIDs reported in cursor.description;
+# anything else is kept as text so every chunk shares one schema
+PG_TYPE_ARROW = {
+    16: pa.bool_(),                         # bool
+    20: pa.int64(),                         # int8
+    21: pa.int16(),                         # int2
+    23: pa.int32(),                         # int4
+    26: pa.int64(),                         # oid
+    700: pa.float32(),                      # float4
+    701: pa.float64(),                      # float8
+    18: pa.string(),                        # char
+    19: pa.string(),                        # name
+    25: pa.string(),                        # text
+    1042: pa.string(),                      # bpchar
+    1043: pa.string(),                      # varchar
+    1082: pa.date32(),                      # date
+    1083: pa.time64("us"),                  # time
+    1114: pa.timestamp("us"),               # timestamp
+    1184: pa.timestamp("us", tz="UTC"),     # timestamptz
+    1186: pa.duration("us"),                # interval
+}
+
+# pandas dtypes used when Arrow columns are converted back for display
+ARROW_PANDAS_DTYPES = {
+    pa.bool_(): pd.BooleanDtype(),
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.string(): pd.StringDtype(),
+}
+NUMERIC_OID = 1700
+
+# Function to remove spill files and directories left behind by earlier processes
+def remove_stale_spill_files():
+    cutoff = time.time() - RESULT_IDLE_TTL
+    for name in os.listdir(RESULT_SPILL_DIR):
+        path = os.path.join(RESULT_SPILL_DIR, name)
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
+
+# Shared store for query results across all sessions; each process spills
+# into its own directory, which is removed when the process exits
+@st.cache_resource
+def get_result_store():
+    os.makedirs(RESULT_SPILL_DIR, exist_ok=True)
+    remove_stale_spill_files()
+    spill_dir = tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=RESULT_SPILL_DIR)
+    atexit.register(shutil.rmtree, spill_dir, ignore_errors=True)
+    return {"lock": threading.Lock(), "entries": OrderedDict(), "dir": spill_dir}
+
+# Function to render a value without a native Arrow type as text
+def text_value(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+# Function to shrink a DataFrame's memory footprint
+def compact_dataframe(df):
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series.dtype):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series.dtype) and series.dtype != "float32":
+            # Only downcast floats when no precision is lost
+            narrowed = series.astype("float32")
+            if ((narrowed.astype("float64") == series) | series.isna()).all():
+                df[col] = narrowed
+        elif pd.api.types.is_string_dtype(series.dtype) and len(series) >= 50:
+            if series.dtype == object and not series.dropna().map(type).eq(str).all():
+                continue
+            if series.nunique(dropna=True) <= len(series) * CATEGORY_MAX_RATIO:
+                df[col] = series.astype("category")
+    return df
+
+# Function to make result column names unique (e.g. 'id' from both sides of a join)
+def unique_column_names(names):
+    seen = set(names)
+    counts = {}
+    unique = []
+    for name in names:
+        if name in counts:
+            suffix = counts[name]
+            while f"{name}_{suffix}" in seen:
+                suffix += 1
+            counts[name] = suffix + 1
+            name = f"{name}_{suffix}"
+            seen.add(name)
+        else:
+            counts[name] = 1
+        unique.append(name)
+    return unique
+
+# Function to build the Arrow schema for a cursor's result
+def result_schema(description):
+    names = unique_column_names([desc[0] for desc in description])
+    return pa.schema([
+        pa.field(name, column_arrow_type(desc))
+        for name, desc in zip(names, description)
+    ])
+
+# Function to choose the Arrow type for one cursor.description entry
+def column_arrow_type(desc):
+    if desc[1] != NUMERIC_OID:
+        return PG_TYPE_ARROW.get(desc[1], pa.string())
+    # psycopg2 reports precision and scale only when the column has a typmod
+    precision = desc[4] if len(desc) > 5 else None
+    scale = desc[5] if len(desc) > 5 else None
+    if not precision:
+        # Unconstrained numeric (e.g. avg(), sum(int)) has no fixed scale
+        return pa.float64()
+    if precision <= 38:
+        return pa.decimal128(precision, scale or 0)
+    if precision <= 76:
+        return pa.decimal256(precision, scale or 0)
+    # Beyond Arrow's decimal range the exact text is kept
+    return pa.string()
+
+# Function to pick the pandas dtype for an Arrow type
+def arrow_pandas_dtype(arrow_type):
+    if pa.types.is_decimal(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return ARROW_PANDAS_DTYPES.get(arrow_type)
+
+# Function to convert one chunk of fetched rows to an Arrow record batch
+def rows_to_batch(rows, schema):
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = []
+    for field, values in zip(schema, columns):
+        if field.type == pa.string():
+            values = [text_value(v) for v in values]
+        elif pa.types.is_floating(field.type):
+            # Unconstrained numeric arrives as Decimal, including NaN and Infinity
+            values = [None if v is None else float(v) for v in values]
+        elif pa.types.is_decimal(field.type):
+            # Arrow decimals cannot hold NaN, so it is shown as null
+            values = [None if v is None or v.is_nan() else v for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+# Function to convert an Arrow table to a DataFrame with nullable dtypes
+def arrow_to_frame(table):
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_date(column.type) or pa.types.is_timestamp(column.type):
+            # Go through Python objects: Arrow's own cast to nanoseconds wraps
+            # silently for values outside the pandas range (e.g. 'infinity')
+            series = column.to_pandas(timestamp_as_object=True)
+            try:
+                series = pd.to_datetime(series, utc=getattr(column.type, "tz", None) is not None)
+            except (ValueError, OverflowError, pd.errors.OutOfBoundsDatetime):
+                pass
+            columns[name] = series
+        elif pa.types.is_duration(column.type):
+            # Same wrap-around as above; intervals beyond ~292 years stay as timedelta objects
+            series = pd.Series(column.to_pylist(), dtype=object)
+            try:
+                series = pd.to_timedelta(series)
+            except (ValueError, OverflowError):
+                pass
+            columns[name] = series
+        else:
+            columns[name] = column.to_pandas(types_mapper=arrow_pandas_dtype)
+    return pd.DataFrame(columns)
+
+# Function to stream a cursor's rows into the result store and return its id
+def fetch_into_store(cursor):
+    result_id = uuid.uuid4().hex
+    path = os.path.join(get_result_store()["dir"], f"{result_id}.arrow")
+    threshold = RESULT_SPILL_THRESHOLD_MB * 1024 * 1024
+    schema = None
+    batches = []
+    held_bytes = 0
+    rows = 0
+    sink = writer = None
+    try:
+        while True:
+            chunk = cursor.fetchmany(RESULT_FETCH_SIZE)
+            # Named cursors only report their description after the first fetch
+            if schema is None:
+                schema = result_schema(cursor.description)
+            if not chunk:
+                break
+            batch = rows_to_batch(chunk, schema)
+            del chunk
+            rows += batch.num_rows
+            held_bytes += batch.nbytes
+            if writer is not None:
+                writer.write_batch(batch)
+                continue
+            batches.append(batch)
+            # Past the threshold, held chunks go to disk and the rest streams after them
+            if held_bytes > threshold:
+                sink = pa.OSFile(path, "wb")
+                writer = pa.ipc.new_file(sink, schema)
+                for held in batches:
+                    writer.write_batch(held)
+                batches = []
+    except Exception:
+        if writer is not None:
+            writer.close()
+            sink.close()
+            os.remove(path)
+        raise
+    if writer is not None:
+        writer.close()
+        sink.close()
+        return store_result(
+            None, result_id=result_id, path=path, rows=rows, columns=schema.names, size=held_bytes
+        )
+    df = compact_dataframe(arrow_to_frame(pa.Table.from_batches(batches, schema=schema)))
+    return store_result(df)
+
+# Function to check whether a query can run on a server-side (named) cursor
+def is_streamable_query(query):
+    # DECLARE only accepts a single read-only SELECT, VALUES or TABLE statement
+    normalized = normalize_query(query)
+    if ";" in normalized or not re.match(r"(select|with|values|table)\b", normalized):
+        return False
+    return not re.search(r"\b(insert|update|delete|merge|into)\b", normalized)
+
+# Function to convert a DataFrame to an Arrow table for spilling
+def to_arrow_table(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (ValueError, TypeError, pa.ArrowNotImplementedError):
+        # Mixed objects (Decimal, JSON, arrays) are spilled as their text form
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].map(text_value)
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+# Function to write a DataFrame to an Arrow file (called without the store lock)
+def write_spill_file(store, result_id, df):
+    path = os.path.join(store["dir"], f"{result_id}.arrow")
+    try:
+        table = to_arrow_table(df)
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=RESULT_PAGE_SIZE * 10)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return path
+
+# Function to remove a result and its spill file
+def discard_result(store, result_id):
+    entry = store["entries"].pop(result_id, None)
+    if entry and entry["path"]:
+        try:
+            os.remove(entry["path"])
+        except OSError:
+            pass
+
+# Function to pick results to spill so the store stays within its memory budgets
+# (called with the store lock held; the chosen entries are marked as spilling)
+def enforce_result_budgets(store, session_id):
+    entries = store["entries"]
+    now = time.time()
+    for result_id in [rid for rid, e in entries.items() if now - e["last_used"] > RESULT_IDLE_TTL]:
+        discard_result(store, result_id)
+
+    session_ids = [rid for rid, e in entries.items() if e["session"] == session_id]
+    for result_id in session_ids[:-RESULT_MAX_PER_SESSION]:
+        discard_result(store, result_id)
+
+    # Entries already being spilled are counted as freed
+    in_memory = [(rid, e) for rid, e in entries.items() if e["df"] is not None and not e["spilling"]]
+    session_limit = RESULT_SESSION_MEMORY_MB * 1024 * 1024
+    global_limit = RESULT_GLOBAL_MEMORY_MB * 1024 * 1024
+    session_bytes = sum(e["bytes"] for _, e in in_memory if e["session"] == session_id)
+    global_bytes = sum(e["bytes"] for _, e in in_memory)
+    # Entries are kept in least-recently-used order, so spill from the front
+    victims = []
+    for result_id, entry in in_memory:
+        if session_bytes <= session_limit and global_bytes <= global_limit:
+            break
+        if global_bytes > global_limit or entry["session"] == session_id:
+            entry["spilling"] = True
+            victims.append(result_id)
+            global_bytes -= entry["bytes"]
+            if entry["session"] == session_id:
+                session_bytes -= entry["bytes"]
+    return victims
+
+# Function to write the chosen results to disk and swap them out of memory
+def spill_results(store, victims, new_result_id=None):
+    for result_id in victims:
+        with store["lock"]:
+            entry = store["entries"].get(result_id)
+            df = entry["df"] if entry is not None else None
+        if df is None:
+            continue
+        # The file is written without the lock so other sessions are not blocked
+        try:
+            path = write_spill_file(store, result_id, df)
+        except Exception:
+            with store["lock"]:
+                entry["spilling"] = False
+                # An unspillable result is dropped rather than blocking every later store;
+                # the result being stored right now stays in memory instead
+                if result_id != new_result_id and store["entries"].get(result_id) is entry:
+                    discard_result(store, result_id)
+            continue
+        with store["lock"]:
+            if store["entries"].get(result_id) is entry:
+                entry["path"] = path
+                entry["df"] = None
+                entry["spilling"] = False
+                continue
+        # Discarded while being written
+        os.remove(path)
+
+# Function to add a result (in memory, or already spilled to path) to the store
+def store_result(df, result_id=None, path=None, rows=None, columns=None, size=None):
+    store = get_result_store()
+    result_id = result_id or uuid.uuid4().hex
+    entry = {
+        "session": st.session_state.session_id,
+        "df": df,
+        "path": path,
+        "rows": len(df) if df is not None else rows,
+        "columns": list(df.columns) if df is not None else columns,
+        "bytes": int(df.memory_usage(deep=True).sum()) if df is not None else size,
+        "last_used": time.time(),
+        "spilling": False,
+    }
+    with store["lock"]:
+        store["entries"][result_id] = entry
+        victims = []
+        if df is not None and entry["bytes"] > RESULT_SPILL_THRESHOLD_MB * 1024 * 1024:
+            entry["spilling"] = True
+            victims.append(result_id)
+        victims += enforce_result_budgets(store, entry["session"])
+    spill_results(store, victims, new_result_id=result_id)
+    return result_id
+
+# Function to get metadata for a stored result
+def get_result_info(result_id):
+    store = get_result_store()
+    with store["lock"]:
+        entry = store["entries"].get(result_id)
+        if entry is None:
+            return None
+        return {
+            "rows": entry["rows"],
+            "columns": entry["columns"],
+            "bytes": entry["bytes"],
+            "spilled": entry["path"] is not None,
+        }
+
+# Function to read one page of a stored result
+def get_result_page(result_id, page, page_size=RESULT_PAGE_SIZE):
+    store = get_result_store()
+    with store["lock"]:
+        entry = store["entries"].get(result_id)
+        if entry is None:
+            return None
+        entry["last_used"] = time.time()
+        store["entries"].move_to_end(result_id)
+        start = page * page_size
+        if entry["df"] is not None:
+            return entry["df"].iloc[start:start + page_size]
+        path = entry["path"]
+    # Memory-mapped reads only touch the pages being sliced
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return arrow_to_frame(table.slice(start, page_size))
+
+# Function to drop a single stored result
+def release_result(result_id):
+    store = get_result_store()
+    with store["lock"]:
+        discard_result(store, result_id)
+
+# Function to drop every stored result owned by this session
+def release_session_results():
+    store = get_result_store()
+    with store["lock"]:
+        for result_id in [rid for rid, e in store["entries"].items()
+                          if e["session"] == st.session_state.session_id]:
+            discard_result(store, result_id)
+
+# Function to display a stored result one page at a time
+def render_result(result_id, key):
+    info = get_result_info(result_id)
+    if info is None:
+        st.info("This result has expired. Run the query again to reload it.")
+        return
+    pages = max(1, -(-info["rows"] // RESULT_PAGE_SIZE))
+    page = 0
+    if pages > 1:
+        page = st.number_input(
+            f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page"
+        ) - 1
+    page_df = get_result_page(result_id, page)
+    if page_df is None:
+        st.info("This result has expired. Run the query again to reload it.")
+        return
+    st.dataframe(page_df, use_container_width=True)
+    location = "disk" if info["spilled"] else "memory"
+    st.caption(f"{info['rows']} rows, {info['bytes'] / (1024 * 1024):.1f} MB, served from {location}")
 
 # Function to connect to the database
 def connect_to_db(host, port, database, user, password):
@@ -65,6 +533,14 @@ def connect_to_db(host, port, database, user, password):
         st.session_state.connection = conn
         st.session_state.cursor = cursor
         st.session_state.connected = True
+        # Kept so maintenance jobs can open their own connections
+        st.session_state.connection_params = {
+            "host": host,
+            "port": port,
+            "database": database,
+            "user": user,
+            "password": password,
+        }
         st.success("Connected to PostgreSQL database!")
         return True
     except Exception as e:
@@ -84,6 +560,13 @@ def disconnect_db():
     st.session_state.selected_schema = None
     st.session_state.tables = []
     st.session_state.selected_table = None
+    st.session_state.explorer_result = None
+    st.session_state.editor_result = None
+    st.session_state.sampled_profile = None
+    st.session_state.connection_params = None
+    st.session_state.maintenance_candidates = None
+    st.session_state.maintenance_jobs = []
+    release_session_results()
     st.success("Disconnected from database.")
 
 # Function to get all schemas
@@ -202,6 +685,220 @@ def get_table_structure(schema, table):
         st.error(f"Error fetching table structure: {e}")
         return None
 
+# Column types that support ordering (min/max and histogram bounds)
+ORDERABLE_TYPES = {
+    "smallint", "integer", "bigint", "numeric", "real", "double precision", "money",
+    "date", "time without time zone", "time with time zone",
+    "timestamp without time zone", "timestamp with time zone", "interval",
+    "text", "character varying", "character", "uuid", "inet",
+}
+# Column types without an equality operator (no DISTINCT); information_schema
+# reports arrays and custom types only as ARRAY / USER-DEFINED, and those may
+# wrap a type without equality (e.g. json[]), so they are skipped as well
+UNCOMPARABLE_TYPES = {
+    "json", "xml", "point", "line", "lseg", "box", "path", "polygon", "circle",
+    "ARRAY", "USER-DEFINED",
+}
+PROFILE_HISTOGRAM_BUCKETS = 10
+PROFILE_SAMPLE_TARGET_PAGES = 1000
+
+# Function to get planner statistics for a table's columns from pg_stats
+def get_column_stats(schema, table):
+    try:
+        # Partitioned parents only have inherited stats, so prefer the plain row
+        st.session_state.cursor.execute("""
+            SELECT DISTINCT ON (a.attnum)
+                s.attname,
+                s.null_frac,
+                s.n_distinct,
+                s.avg_width,
+                s.correlation,
+                s.most_common_vals::text::text[],
+                s.most_common_freqs,
+                s.histogram_bounds::text::text[],
+                c.reltuples
+            FROM pg_stats s
+            JOIN pg_namespace n ON n.nspname = s.schemaname
+            JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = s.tablename
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attname = s.attname
+            WHERE s.schemaname = %s AND s.tablename = %s
+            ORDER BY a.attnum, s.inherited;
+        """, (schema, table))
+        stats = {}
+        for row in st.session_state.cursor.fetchall():
+            name, null_frac, n_distinct, avg_width, correlation, mcv, mcf, bounds, reltuples = row
+            # Negative n_distinct is a fraction of the row count
+            if n_distinct is not None and n_distinct < 0:
+                n_distinct = -n_distinct * max(reltuples or 0, 0)
+            stats[name] = {
+                "null_frac": null_frac,
+                "n_distinct": n_distinct,
+                "avg_width": avg_width,
+                "correlation": correlation,
+                "most_common_vals": mcv or [],
+                "most_common_freqs": mcf or [],
+                "histogram_bounds": bounds or [],
+            }
+        return stats
+    except Exception as e:
+        st.session_state.connection.rollback()
+        st.error(f"Error fetching column statistics: {e}")
+        return None
+
+# Function to get a table's current size in pages (known even before ANALYZE)
+def get_table_page_count(schema, table):
+    try:
+        st.session_state.cursor.execute("""
+            SELECT pg_relation_size(c.oid) / current_setting('block_size')::int
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s;
+        """, (schema, table))
+        row = st.session_state.cursor.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        st.session_state.connection.rollback()
+        st.error(f"Error fetching table size: {e}")
+        return None
+
+# Function to suggest a sample percentage that reads about PROFILE_SAMPLE_TARGET_PAGES pages
+def default_sample_percent(pages):
+    if not pages:
+        return 100.0
+    return round(min(100.0, max(1.0, PROFILE_SAMPLE_TARGET_PAGES * 100 / pages)), 2)
+
+# Function to build one TABLESAMPLE query that profiles every column in a single pass
+def build_sample_profile_query(schema, table, columns, percent, method="SYSTEM"):
+    fractions = ", ".join(
+        str(i / PROFILE_HISTOGRAM_BUCKETS) for i in range(PROFILE_HISTOGRAM_BUCKETS + 1)
+    )
+    aggregates = [sql.SQL("count(*)")]
+    for name, data_type in columns:
+        col = sql.Identifier(name)
+        aggregates.append(sql.SQL("count({})").format(col))
+        if data_type in UNCOMPARABLE_TYPES:
+            aggregates.append(sql.SQL("NULL::bigint"))
+        else:
+            aggregates.append(sql.SQL("count(DISTINCT {})").format(col))
+        if data_type in ORDERABLE_TYPES:
+            aggregates.append(sql.SQL(
+                "(percentile_disc(ARRAY[{}]) WITHIN GROUP (ORDER BY {}))::text[]"
+            ).format(sql.SQL(fractions), col))
+        else:
+            aggregates.append(sql.SQL("NULL::text[]"))
+    return sql.SQL("SELECT {} FROM {}.{} TABLESAMPLE {} ({})").format(
+        sql.SQL(", ").join(aggregates),
+        sql.Identifier(schema),
+        sql.Identifier(table),
+        sql.SQL("BERNOULLI" if method == "BERNOULLI" else "SYSTEM"),
+        sql.Literal(float(percent)),
+    )
+
+# Function to profile columns from a table sample when pg_stats is empty
+def get_sampled_column_stats(schema, table, columns, percent, method="SYSTEM"):
+    try:
+        query = build_sample_profile_query(schema, table, columns, percent, method)
+        st.session_state.cursor.execute(query)
+        row = st.session_state.cursor.fetchone()
+        sampled_rows = row[0]
+        stats = {}
+        for i, (name, _) in enumerate(columns):
+            non_null, distinct, bounds = row[1 + i * 3:4 + i * 3]
+            stats[name] = {
+                "null_frac": 1 - non_null / sampled_rows if sampled_rows else None,
+                "n_distinct": distinct,
+                "avg_width": None,
+                "correlation": None,
+                "most_common_vals": [],
+                "most_common_freqs": [],
+                "histogram_bounds": bounds or [],
+            }
+        return sampled_rows, stats
+    except Exception as e:
+        st.session_state.connection.rollback()
+        st.error(f"Error sampling table: {e}")
+        return None, None
+
+# Function to turn equi-depth histogram bounds into a bar chart frame
+def histogram_frame(bounds, data_type=None):
+    try:
+        if data_type and data_type.startswith(("date", "timestamp")):
+            # Temporal bounds are measured in days
+            timestamps = pd.to_datetime(pd.Series(bounds), utc=True)
+            values = ((timestamps - timestamps.iloc[0]).dt.total_seconds() / 86400).tolist()
+        else:
+            values = [float(b) for b in bounds]
+    except (TypeError, ValueError, OverflowError, pd.errors.OutOfBoundsDatetime):
+        return None
+    if len(values) < 2:
+        return None
+    # Every bucket holds the same share of rows, so height is share / width
+    share = 1 / (len(values) - 1)
+    mean_width = (values[-1] - values[0]) / (len(values) - 1)
+    rows = []
+    for i, (lo, hi) in enumerate(zip(values, values[1:])):
+        if hi > lo:
+            density = share / (hi - lo)
+        else:
+            # Repeated bounds mean one value fills the whole bucket; draw that
+            # point mass as if it were spread over an average-width bucket
+            density = share / mean_width if mean_width > 0 else share
+        rows.append({"Bucket": i + 1, "Range": f"{bounds[i]} – {bounds[i + 1]}", "Density": density})
+    # A numeric bucket index keeps the bars in bound order
+    return pd.DataFrame(rows).set_index("Bucket")
+
+# Function to display the profile summary and charts for one table
+def render_column_profile(columns, stats, key):
+    summary = []
+    for name, data_type in columns:
+        col_stats = stats.get(name)
+        if col_stats is None:
+            continue
+        null_frac = col_stats["null_frac"]
+        n_distinct = col_stats["n_distinct"]
+        summary.append({
+            "Column": name,
+            "Data Type": data_type,
+            "Null %": round(null_frac * 100, 2) if null_frac is not None else None,
+            "Distinct": int(round(n_distinct)) if n_distinct is not None else None,
+            "Avg Width": col_stats["avg_width"],
+            "Correlation": col_stats["correlation"],
+        })
+    if not summary:
+        return
+    st.dataframe(pd.DataFrame(summary), use_container_width=True)
+
+    profile_column = st.selectbox(
+        "Column details",
+        options=[row["Column"] for row in summary],
+        key=f"{key}_column"
+    )
+    col_stats = stats[profile_column]
+    data_types = dict(columns)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Most common values**")
+        if col_stats["most_common_vals"]:
+            mcv_df = pd.DataFrame(
+                {"Frequency": col_stats["most_common_freqs"]},
+                index=col_stats["most_common_vals"]
+            )
+            st.bar_chart(mcv_df)
+        else:
+            st.caption("No most common values recorded.")
+    with col2:
+        st.markdown("**Distribution**")
+        bounds = col_stats["histogram_bounds"]
+        hist_df = histogram_frame(bounds, data_types.get(profile_column))
+        if hist_df is not None:
+            st.bar_chart(hist_df[["Density"]])
+            with st.expander("Bucket bounds"):
+                st.dataframe(hist_df[["Range"]], use_container_width=True)
+        elif bounds:
+            st.write(", ".join(bounds))
+        else:
+            st.caption("No histogram recorded.")
+
 # Function to get table data
 def get_table_data(schema, table, limit=100, offset=0, where_clause=None, order_by=None):
     try:
@@ -223,45 +920,249 @@ def get_table_data(schema, table, limit=100, offset=0, where_clause=None, order_
         # Add LIMIT and OFFSET
         query = sql.SQL("{} LIMIT {} OFFSET {}").format(query, sql.Literal(limit), sql.Literal(offset))
         
-        # Execute the query
-        st.session_state.cursor.execute(query)
-        data = st.session_state.cursor.fetchall()
-        
-        # Get column names
-        col_names = [desc[0] for desc in st.session_state.cursor.description]
-        
-        return pd.DataFrame(data, columns=col_names)
+        # Stream the rows from a server-side cursor into the result store
+        cursor = st.session_state.connection.cursor(name=f"table_data_{uuid.uuid4().hex}")
+        try:
+            cursor.execute(query)
+            return fetch_into_store(cursor)
+        finally:
+            cursor.close()
     except Exception as e:
         st.error(f"Error fetching table data: {e}")
         return None
 
+# Function to get the history file for a connection identity (user@host:port/database)
+def history_db_path(params):
+    identity = f"{params['user']}@{params['host']}:{params['port']}/{params['database']}"
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(HISTORY_DIR, f"history-{digest}.sqlite3")
+
+# Function to create a history file (one per connection identity), readable only by the app's OS user
+def init_history_db(path):
+    os.makedirs(HISTORY_DIR, mode=0o700, exist_ok=True)
+    os.chmod(HISTORY_DIR, 0o700)
+    # Create the file owner-only before SQLite opens it; WAL files inherit the mode
+    os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+    os.chmod(path, 0o600)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queries (
+                fingerprint TEXT PRIMARY KEY,
+                normalized TEXT NOT NULL,
+                query TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS executions (
+                id INTEGER PRIMARY KEY,
+                fingerprint TEXT NOT NULL REFERENCES queries (fingerprint),
+                executed_at REAL NOT NULL,
+                duration_ms REAL NOT NULL,
+                rows INTEGER,
+                database TEXT
+            );
+            CREATE INDEX IF NOT EXISTS executions_fingerprint_idx
+                ON executions (fingerprint, executed_at);
+            CREATE INDEX IF NOT EXISTS executions_executed_at_idx
+                ON executions (executed_at);
+        """)
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+# Function to open the history database for the current connection
+def get_history_connection(params):
+    path = history_db_path(params)
+    # Checked on every open so a deleted or rotated file is recreated owner-only with its tables
+    if not os.path.exists(path):
+        init_history_db(path)
+    # mode=rw stops SQLite from silently creating a bare file if it vanishes in between
+    return sqlite3.connect(pathlib.Path(path).as_uri() + "?mode=rw", uri=True, timeout=5)
+
+# Function to normalize a query so runs with different literals share a fingerprint
+def normalize_query(query):
+    # Strings and comments are matched together so '--' inside a literal is kept
+    normalized = re.sub(
+        r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/",
+        lambda m: "?" if m.group(0).startswith("'") else " ",
+        query,
+        flags=re.S
+    )
+    # Spacing around operators and punctuation does not change the query
+    normalized = re.sub(r"\s*([=<>(),;:+\-*/])\s*", r"\1", normalized)
+    # Numeric literals, including negative, decimal and exponent forms; a minus
+    # directly after an identifier is subtraction and is left in place
+    normalized = re.sub(
+        r"(?<![\w$.])-?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?",
+        "?",
+        normalized,
+        flags=re.I
+    )
+    normalized = re.sub(r"\s+", " ", normalized).strip().rstrip(";").strip().lower()
+    # IN lists of any length collapse to a single placeholder
+    return re.sub(r"\(\?(?:,\?)+\)", "(?)", normalized)
+
+# Function to compute a query's fingerprint
+def fingerprint_query(query):
+    return hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()[:16]
+
+# Function to check a run against its query's own latency baseline
+def detect_regression(duration_ms, baseline_ms):
+    if len(baseline_ms) < HISTORY_MIN_BASELINE_RUNS:
+        return None
+    baseline = pd.Series(baseline_ms)
+    p50 = baseline.quantile(0.5)
+    p95 = baseline.quantile(0.95)
+    if duration_ms > max(p50 * REGRESSION_FACTOR, p95) and duration_ms - p50 > REGRESSION_MIN_DELTA_MS:
+        return {"duration_ms": duration_ms, "p50_ms": p50, "p95_ms": p95}
+    return None
+
+# Function to record one execution in the history and check it for a regression
+def record_query_execution(params, query, duration_ms, rows):
+    fingerprint = fingerprint_query(query)
+    database = params["database"]
+    now = time.time()
+    try:
+        conn = get_history_connection(params)
+        try:
+            baseline_ms = [row[0] for row in conn.execute("""
+                SELECT duration_ms FROM executions
+                WHERE fingerprint = ? AND database = ?
+                ORDER BY executed_at DESC
+                LIMIT ?;
+            """, (fingerprint, database, HISTORY_BASELINE_RUNS))]
+            with conn:
+                conn.execute("""
+                    INSERT INTO queries (fingerprint, normalized, query, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (fingerprint) DO UPDATE
+                        SET query = excluded.query, last_seen = excluded.last_seen;
+                """, (fingerprint, normalize_query(query), query.strip(), now, now))
+                conn.execute("""
+                    INSERT INTO executions (fingerprint, executed_at, duration_ms, rows, database)
+                    VALUES (?, ?, ?, ?, ?);
+                """, (fingerprint, now, duration_ms, rows, database))
+                
+                # Retention: a bounded number of runs per query and nothing older than the cutoff
+                conn.execute("""
+                    DELETE FROM executions
+                    WHERE fingerprint = ? AND id NOT IN (
+                        SELECT id FROM executions
+                        WHERE fingerprint = ?
+                        ORDER BY executed_at DESC
+                        LIMIT ?
+                    );
+                """, (fingerprint, fingerprint, HISTORY_MAX_RUNS_PER_QUERY))
+                cutoff = now - HISTORY_RETENTION_DAYS * 86400
+                conn.execute("DELETE FROM executions WHERE executed_at < ?;", (cutoff,))
+                conn.execute("DELETE FROM queries WHERE last_seen < ?;", (cutoff,))
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        # History is best effort and must never fail the query itself
+        return None
+    return detect_regression(duration_ms, baseline_ms)
+
+# Function to search the history and summarize latency per fingerprint
+def search_query_history(params, search="", limit=50):
+    try:
+        conn = get_history_connection(params)
+        try:
+            queries = conn.execute("""
+                SELECT fingerprint, query, last_seen
+                FROM queries
+                WHERE query LIKE ? ESCAPE '\\'
+                ORDER BY last_seen DESC
+                LIMIT ?;
+            """, ("%" + re.sub(r"([\\%_])", r"\\\1", search) + "%", limit)).fetchall()
+            if not queries:
+                return pd.DataFrame()
+            placeholders = ", ".join("?" for _ in queries)
+            executions = pd.read_sql_query(f"""
+                SELECT fingerprint, executed_at, duration_ms, rows, database
+                FROM (
+                    SELECT e.*, row_number() OVER (
+                        PARTITION BY fingerprint ORDER BY executed_at DESC
+                    ) AS rn
+                    FROM executions e
+                    WHERE fingerprint IN ({placeholders})
+                )
+                WHERE rn <= ?
+                ORDER BY executed_at;
+            """, conn, params=[q[0] for q in queries] + [HISTORY_BASELINE_RUNS + 1])
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        st.error(f"Error reading query history: {e}")
+        return pd.DataFrame()
+
+    rows = []
+    for fingerprint, query, last_seen in queries:
+        runs = executions[executions["fingerprint"] == fingerprint]
+        if runs.empty:
+            continue
+        durations = runs["duration_ms"].tolist()
+        latest = runs.iloc[-1]
+        rows.append({
+            "fingerprint": fingerprint,
+            "query": query,
+            "Runs": len(runs),
+            "p50 ms": round(runs["duration_ms"].quantile(0.5), 1),
+            "p95 ms": round(runs["duration_ms"].quantile(0.95), 1),
+            "Last ms": round(latest["duration_ms"], 1),
+            "Last Rows": latest["rows"],
+            "Database": latest["database"],
+            "Last Run": pd.to_datetime(latest["executed_at"], unit="s").floor("s"),
+            "Regressed": "⚠️" if detect_regression(durations[-1], durations[:-1]) else "",
+        })
+    return pd.DataFrame(rows)
+
 # Function to execute SQL query
 def execute_query(query):
     try:
-        st.session_state.cursor.execute(query)
-        st.session_state.connection.commit()
+        started = time.perf_counter()
         
-        # Add query to history
-        if query.strip() not in st.session_state.query_history:
-            st.session_state.query_history.append(query.strip())
-            if len(st.session_state.query_history) > 10:
-                st.session_state.query_history.pop(0)
+        # Plain reads stream from a server-side cursor so rows arrive in chunks
+        if is_streamable_query(query):
+            cursor = st.session_state.connection.cursor(name=f"query_{uuid.uuid4().hex}")
+            try:
+                cursor.execute(query)
+                result_id = fetch_into_store(cursor)
+            finally:
+                cursor.close()
+            st.session_state.connection.commit()
+        else:
+            cursor = st.session_state.cursor
+            cursor.execute(query)
+            st.session_state.connection.commit()
+            result_id = fetch_into_store(cursor) if cursor.description else None
         
         # Check if the query returns data
-        if st.session_state.cursor.description:
-            data = st.session_state.cursor.fetchall()
-            col_names = [desc[0] for desc in st.session_state.cursor.description]
-            result_df = pd.DataFrame(data, columns=col_names)
+        if result_id is not None:
+            duration_ms = (time.perf_counter() - started) * 1000
+            rows = get_result_info(result_id)["rows"]
+            regression = record_query_execution(
+                st.session_state.connection_params, query, duration_ms, rows
+            )
             return {
                 "success": True,
-                "message": f"Query executed successfully. Rows returned: {len(data)}",
-                "data": result_df
+                "message": f"Query executed successfully in {duration_ms:.0f} ms. Rows returned: {rows}",
+                "data": result_id,
+                "regression": regression
             }
         else:
+            duration_ms = (time.perf_counter() - started) * 1000
+            regression = record_query_execution(
+                st.session_state.connection_params, query, duration_ms, st.session_state.cursor.rowcount
+            )
             return {
                 "success": True,
-                "message": f"Query executed successfully. Rows affected: {st.session_state.cursor.rowcount}",
-                "data": None
+                "message": f"Query executed successfully in {duration_ms:.0f} ms. Rows affected: {st.session_state.cursor.rowcount}",
+                "data": None,
+                "regression": regression
             }
     except Exception as e:
         st.session_state.connection.rollback()
@@ -271,6 +1172,191 @@ def execute_query(query):
             "data": None
         }
 
+# Function to open a separate autocommit connection for maintenance commands
+def open_maintenance_connection(params):
+    conn = psycopg2.connect(**params)
+    # VACUUM cannot run inside a transaction block
+    conn.autocommit = True
+    return conn
+
+# Function to format a byte count for display
+def format_bytes(size):
+    if size is None:
+        return None
+    for unit in ["B", "kB", "MB", "GB"]:
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+# Function to find tables that need VACUUM or ANALYZE
+def get_maintenance_candidates(params, min_dead_ratio, stale_days, schema=None):
+    try:
+        conn = open_maintenance_connection(params)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT *
+                FROM (
+                    SELECT
+                        schemaname,
+                        relname,
+                        n_live_tup,
+                        n_dead_tup,
+                        CASE WHEN n_live_tup + n_dead_tup > 0
+                            THEN n_dead_tup::float / (n_live_tup + n_dead_tup)
+                            ELSE 0 END AS dead_ratio,
+                        n_mod_since_analyze,
+                        greatest(last_vacuum, last_autovacuum) AS last_vacuum,
+                        greatest(last_analyze, last_autoanalyze) AS last_analyze,
+                        pg_total_relation_size(relid) AS total_size
+                    FROM pg_stat_user_tables
+                    WHERE %(schema)s IS NULL OR schemaname = %(schema)s
+                ) t
+                WHERE dead_ratio >= %(min_dead_ratio)s
+                    OR last_analyze IS NULL
+                    OR last_analyze < now() - make_interval(days => %(stale_days)s)
+                ORDER BY dead_ratio DESC, n_dead_tup DESC;
+            """, {"schema": schema, "min_dead_ratio": min_dead_ratio, "stale_days": stale_days})
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    except Exception as e:
+        st.error(f"Error fetching maintenance candidates: {e}")
+        return None
+
+# Function to read dead tuple and size figures for one table
+def get_table_maintenance_stats(cursor, schema, table):
+    cursor.execute("""
+        SELECT n_dead_tup, pg_total_relation_size(relid)
+        FROM pg_stat_user_tables
+        WHERE schemaname = %s AND relname = %s;
+    """, (schema, table))
+    row = cursor.fetchone()
+    return {"dead_tuples": row[0], "size": row[1]} if row else {"dead_tuples": None, "size": None}
+
+# Function to run one maintenance job (called from a worker thread)
+def run_maintenance_job(params, job):
+    try:
+        conn = open_maintenance_connection(params)
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        job["finished"] = time.time()
+        return
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_backend_pid();")
+        job["pid"] = cursor.fetchone()[0]
+        job["before"] = get_table_maintenance_stats(cursor, job["schema"], job["table"])
+        job["status"] = "running"
+        job["started"] = time.time()
+        command = sql.SQL("VACUUM (ANALYZE) {}.{}" if job["command"] == "VACUUM (ANALYZE)" else "ANALYZE {}.{}")
+        del conn.notices[:]
+        cursor.execute(command.format(sql.Identifier(job["schema"]), sql.Identifier(job["table"])))
+        job["finished"] = time.time()
+        # Without ownership PostgreSQL only warns that it is skipping the table
+        skipped = [notice.strip() for notice in conn.notices if "skipping" in notice or "permission denied" in notice]
+        job["after"] = get_table_maintenance_stats(cursor, job["schema"], job["table"])
+        if skipped:
+            job["status"] = "skipped"
+            job["error"] = " ".join(skipped)
+        else:
+            job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        job["finished"] = time.time()
+    finally:
+        conn.close()
+
+# Function to queue maintenance jobs with a parallelism limit
+def start_maintenance_jobs(params, tables, command, parallelism):
+    jobs = [
+        {
+            "schema": schema,
+            "table": table,
+            "command": command,
+            "status": "queued",
+            "pid": None,
+            "error": None,
+            "before": {},
+            "after": {},
+            "started": None,
+            "finished": None,
+        }
+        for schema, table in tables
+    ]
+    executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="maintenance")
+    for job in jobs:
+        executor.submit(run_maintenance_job, params, job)
+    # Queued jobs keep running after shutdown; this only stops new submissions
+    executor.shutdown(wait=False)
+    return jobs
+
+# Function to read live VACUUM/ANALYZE progress keyed by backend pid
+def get_maintenance_progress(conn):
+    progress = {}
+    if conn.closed:
+        return progress
+    with conn.cursor() as cursor:
+        # heap_blks_vacuumed only moves in the 'vacuuming heap' phase, so the
+        # scan counter is reported alongside it
+        queries = [
+            """
+                SELECT pid, phase, heap_blks_total, heap_blks_scanned, heap_blks_vacuumed
+                FROM pg_stat_progress_vacuum;
+            """,
+            # pg_stat_progress_analyze is only available on PostgreSQL 13 and later
+            """
+                SELECT pid, phase, sample_blks_total, sample_blks_scanned, NULL
+                FROM pg_stat_progress_analyze;
+            """,
+        ]
+        for query in queries:
+            try:
+                cursor.execute(query)
+            except psycopg2.Error:
+                continue
+            for pid, phase, total, scanned, vacuumed in cursor.fetchall():
+                progress[pid] = {
+                    "phase": phase,
+                    "scanned": round(scanned * 100 / total, 1) if total else None,
+                    "vacuumed": round(vacuumed * 100 / total, 1) if total and vacuumed is not None else None,
+                }
+    return progress
+
+# Function to display the state of maintenance jobs
+def render_maintenance_jobs(jobs, progress):
+    rows = []
+    for job in jobs:
+        live = progress.get(job["pid"], {}) if job["status"] == "running" else {}
+        if job["finished"] and job["started"]:
+            elapsed = job["finished"] - job["started"]
+        elif job["started"] and not job["finished"]:
+            elapsed = time.time() - job["started"]
+        else:
+            elapsed = None
+        rows.append({
+            "Table": f"{job['schema']}.{job['table']}",
+            "Command": job["command"],
+            "Status": job["status"],
+            "Phase": live.get("phase"),
+            "Scanned %": 100.0 if job["status"] == "done" else live.get("scanned"),
+            "Vacuumed %": (
+                100.0 if job["status"] == "done" and job["command"] != "ANALYZE" else live.get("vacuumed")
+            ),
+            "Seconds": round(elapsed, 1) if elapsed is not None else None,
+            "Dead Tuples Before": job["before"].get("dead_tuples"),
+            "Dead Tuples After": job["after"].get("dead_tuples"),
+            "Size Before": format_bytes(job["before"].get("size")),
+            "Size After": format_bytes(job["after"].get("size")),
+            "Error": job["error"],
+        })
+    finished = sum(job["status"] in ("done", "failed", "skipped") for job in jobs)
+    st.progress(finished / len(jobs), text=f"{finished} of {len(jobs)} jobs finished")
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
 # Function to create a new table
 def create_table(schema, table_name, columns):
     try:
@@ -351,8 +1437,8 @@ if st.session_state.connected:
         if st.session_state.selected_schema and st.session_state.selected_table:
             st.header(f"Table: {st.session_state.selected_schema}.{st.session_state.selected_table}")
             
-            # Sub-tabs for structure and data
-            subtabs = st.tabs(["Data", "Structure"])
+            # Sub-tabs for structure, data and column profile
+            subtabs = st.tabs(["Data", "Structure", "Profile"])
             
             # Data sub-tab
             with subtabs[0]:
@@ -367,9 +1453,14 @@ if st.session_state.connected:
                     where_clause = st.text_input("WHERE Clause (without 'WHERE')", "")
                     order_by = st.text_input("ORDER BY Clause (without 'ORDER BY')", "")
                 
+                current_table = (st.session_state.selected_schema, st.session_state.selected_table)
+                
                 # Load button
                 if st.button("Load Data"):
-                    data_df = get_table_data(
+                    if st.session_state.explorer_result:
+                        release_result(st.session_state.explorer_result["result_id"])
+                        st.session_state.explorer_result = None
+                    result_id = get_table_data(
                         st.session_state.selected_schema,
                         st.session_state.selected_table,
                         limit,
@@ -377,10 +1468,17 @@ if st.session_state.connected:
                         where_clause,
                         order_by
                     )
-                    if data_df is not None and not data_df.empty:
-                        st.dataframe(data_df, use_container_width=True)
-                    elif data_df is not None and data_df.empty:
+                    if result_id is not None:
+                        st.session_state.explorer_result = {"table": current_table, "result_id": result_id}
+                
+                # Keep showing the loaded result across reruns (e.g. paging)
+                explorer_result = st.session_state.explorer_result
+                if explorer_result and explorer_result["table"] == current_table:
+                    info = get_result_info(explorer_result["result_id"])
+                    if info is not None and info["rows"] == 0:
                         st.info("No data found for the selected table with the given criteria.")
+                    else:
+                        render_result(explorer_result["result_id"], key="explorer_result")
             
             # Structure sub-tab
             with subtabs[1]:
@@ -426,6 +1524,79 @@ if st.session_state.connected:
                         # Convert boolean to checkmark
                         indexes_df["Unique"] = indexes_df["Unique"].apply(lambda x: "✓" if x else "")
                         st.dataframe(indexes_df, use_container_width=True)
+            
+            # Profile sub-tab
+            with subtabs[2]:
+                # Reuses the structure already fetched for the Structure sub-tab
+                stats = get_column_stats(
+                    st.session_state.selected_schema,
+                    st.session_state.selected_table
+                )
+                
+                if structure and stats is not None:
+                    profile_columns = [(col[0], col[1]) for col in structure["columns"]]
+                    st.caption("Read from pg_stats; no table scan is performed.")
+                    render_column_profile(profile_columns, stats, key="stats_profile")
+                    
+                    # Offer a sampled profile for columns the planner has no stats for
+                    unanalyzed = [col for col in profile_columns if col[0] not in stats]
+                    if unanalyzed:
+                        if stats:
+                            st.info(f"No statistics for: {', '.join(col[0] for col in unanalyzed)}")
+                        else:
+                            st.info("This table has not been analyzed yet. Profile a sample instead.")
+                        # Unanalyzed tables are usually new and small, where a low
+                        # SYSTEM (block) sample often returns no rows at all
+                        table_pages = get_table_page_count(
+                            st.session_state.selected_schema,
+                            st.session_state.selected_table
+                        )
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            sample_percent = st.number_input(
+                                "Sample Percent", min_value=0.01, max_value=100.0,
+                                value=default_sample_percent(table_pages),
+                                key="profile_sample_percent"
+                            )
+                        with col2:
+                            sample_method = st.selectbox(
+                                "Method", ["BERNOULLI", "SYSTEM"], key="profile_sample_method"
+                            )
+                        if table_pages is not None:
+                            st.caption(f"Table size: {table_pages} pages")
+                        sample_query = build_sample_profile_query(
+                            st.session_state.selected_schema,
+                            st.session_state.selected_table,
+                            unanalyzed,
+                            sample_percent,
+                            sample_method
+                        )
+                        with st.expander("Sample Query"):
+                            st.code(sample_query.as_string(st.session_state.connection), language="sql")
+                        
+                        if st.button("Profile Sample"):
+                            sampled_rows, sampled_stats = get_sampled_column_stats(
+                                st.session_state.selected_schema,
+                                st.session_state.selected_table,
+                                unanalyzed,
+                                sample_percent,
+                                sample_method
+                            )
+                            if sampled_stats is not None:
+                                st.session_state.sampled_profile = {
+                                    "table": (st.session_state.selected_schema, st.session_state.selected_table),
+                                    "rows": sampled_rows,
+                                    "stats": sampled_stats,
+                                }
+                        
+                        sampled_profile = st.session_state.sampled_profile
+                        if sampled_profile and sampled_profile["table"] == (
+                            st.session_state.selected_schema, st.session_state.selected_table
+                        ):
+                            st.caption(
+                                f"Sampled {sampled_profile['rows']} rows; distinct counts are within the sample."
+                            )
+                            render_column_profile(unanalyzed, sampled_profile["stats"], key="sample_profile")
         else:
             st.info("Select a schema and table from the sidebar to explore.")
     
@@ -433,14 +1604,21 @@ if st.session_state.connected:
     with tabs[1]:
         st.header("SQL Query Editor")
         
-        # Query history dropdown
-        if st.session_state.query_history:
+        # Searchable query history with latency statistics
+        history_search = st.text_input("Search Query History", "")
+        history_df = search_query_history(st.session_state.connection_params, history_search)
+        if not history_df.empty:
+            with st.expander("History Statistics"):
+                st.dataframe(history_df.drop(columns=["fingerprint"]), use_container_width=True)
+            history_queries = dict(zip(history_df["fingerprint"], history_df["query"]))
             selected_history = st.selectbox(
                 "Query History",
-                options=[""] + st.session_state.query_history,
-                format_func=lambda x: x[:50] + "..." if len(x) > 50 else x
+                options=[""] + list(history_queries),
+                format_func=lambda x: (
+                    history_queries[x][:50] + "..." if len(history_queries[x]) > 50 else history_queries[x]
+                ) if x else ""
             )
-            query_text = selected_history
+            query_text = history_queries.get(selected_history, "")
         else:
             query_text = ""
         
@@ -450,24 +1628,38 @@ if st.session_state.connected:
         # Execute button
         if st.button("Execute Query"):
             if query.strip():
+                if st.session_state.editor_result and st.session_state.editor_result["data"]:
+                    release_result(st.session_state.editor_result["data"])
                 with st.spinner("Executing query..."):
                     result = execute_query(query)
-                
-                if result["success"]:
-                    st.success(result["message"])
-                    if result["data"] is not None:
-                        st.dataframe(result["data"], use_container_width=True)
-                else:
-                    st.error(result["message"])
+                st.session_state.editor_result = result
             else:
+                st.session_state.editor_result = None
                 st.warning("Please enter a SQL query to execute.")
+        
+        # Keep showing the last result across reruns (e.g. paging)
+        editor_result = st.session_state.editor_result
+        if editor_result:
+            if editor_result["success"]:
+                st.success(editor_result["message"])
+                regression = editor_result.get("regression")
+                if regression:
+                    st.warning(
+                        f"This run took {regression['duration_ms']:.0f} ms, well above this query's "
+                        f"usual {regression['p50_ms']:.0f} ms (p50) / {regression['p95_ms']:.0f} ms (p95). "
+                        "The plan may have regressed."
+                    )
+                if editor_result["data"] is not None:
+                    render_result(editor_result["data"], key="editor_result")
+            else:
+                st.error(editor_result["message"])
     
     # Table Management tab
     with tabs[2]:
         st.header("Table Management")
         
         # Sub-tabs for different management options
-        mgmt_tabs = st.tabs(["Create Table", "Modify Table", "Drop Table"])
+        mgmt_tabs = st.tabs(["Create Table", "Modify Table", "Drop Table", "Maintenance"])
         
         # Create Table tab
         with mgmt_tabs[0]:
@@ -731,5 +1923,98 @@ if st.session_state.connected:
                         st.error("Table name doesn't match. Please type the correct table name to confirm.")
             else:
                 st.info("Select a schema and table from the sidebar to drop.")
+        
+        # Maintenance tab
+        with mgmt_tabs[3]:
+            st.subheader("Vacuum and Analyze")
+            
+            # Candidate selection from pg_stat_user_tables
+            with st.form("maintenance_filter_form"):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    min_dead_pct = st.number_input("Min Dead Tuple %", min_value=0.0, max_value=100.0, value=10.0)
+                with col2:
+                    stale_days = st.number_input("Not Analyzed In (days)", min_value=1, value=7)
+                with col3:
+                    maintenance_schema = st.selectbox(
+                        "Schema",
+                        options=["All schemas"] + st.session_state.schemas,
+                        key="maintenance_schema"
+                    )
+                find_tables = st.form_submit_button("Find Tables")
+                
+                if find_tables:
+                    st.session_state.maintenance_candidates = get_maintenance_candidates(
+                        st.session_state.connection_params,
+                        min_dead_pct / 100,
+                        int(stale_days),
+                        None if maintenance_schema == "All schemas" else maintenance_schema
+                    )
+            
+            candidates = st.session_state.maintenance_candidates
+            if candidates is not None:
+                if candidates:
+                    candidates_df = pd.DataFrame(
+                        candidates,
+                        columns=["Schema", "Table", "Live Tuples", "Dead Tuples", "Dead %",
+                                 "Modified Since Analyze", "Last Vacuum", "Last Analyze", "Size"]
+                    )
+                    candidates_df["Dead %"] = (candidates_df["Dead %"] * 100).round(2)
+                    candidates_df["Size"] = candidates_df["Size"].apply(format_bytes)
+                    st.dataframe(candidates_df, use_container_width=True)
+                    
+                    table_labels = [f"{row[0]}.{row[1]}" for row in candidates]
+                    selected_labels = st.multiselect("Tables", options=table_labels, default=table_labels)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        maintenance_command = st.selectbox("Command", ["VACUUM (ANALYZE)", "ANALYZE"])
+                    with col2:
+                        parallelism = st.number_input("Parallel Jobs", min_value=1, max_value=8, value=2)
+                    
+                    jobs_running = any(
+                        job["status"] in ("queued", "running") for job in st.session_state.maintenance_jobs
+                    )
+                    if st.button("Run Maintenance", disabled=jobs_running):
+                        if not selected_labels:
+                            st.error("Please select at least one table.")
+                        else:
+                            selected_tables = [
+                                (row[0], row[1]) for row in candidates
+                                if f"{row[0]}.{row[1]}" in selected_labels
+                            ]
+                            st.session_state.maintenance_jobs = start_maintenance_jobs(
+                                st.session_state.connection_params,
+                                selected_tables,
+                                maintenance_command,
+                                int(parallelism)
+                            )
+                else:
+                    st.info("No tables match the selected thresholds.")
+            
+            # Live progress; keeps polling until every job has finished
+            if st.session_state.maintenance_jobs:
+                st.subheader("Jobs")
+                jobs_placeholder = st.empty()
+                jobs = st.session_state.maintenance_jobs
+                
+                # One autocommit connection serves the whole polling loop
+                monitor = None
+                if any(job["status"] in ("queued", "running") for job in jobs):
+                    try:
+                        monitor = open_maintenance_connection(st.session_state.connection_params)
+                    except Exception as e:
+                        st.warning(f"Live progress is unavailable: {e}")
+                try:
+                    while True:
+                        active = any(job["status"] in ("queued", "running") for job in jobs)
+                        progress = get_maintenance_progress(monitor) if active and monitor else {}
+                        with jobs_placeholder.container():
+                            render_maintenance_jobs(jobs, progress)
+                        if not active:
+                            break
+                        time.sleep(1)
+                finally:
+                    if monitor is not None:
+                        monitor.close()
 else:
     st.info("Please connect to a PostgreSQL database using the sidebar.")
\ No newline at end of file